@@ -45,7 +45,9 @@ class DQNLearner(learning_lib.SGDLearner):
                huber_loss_parameter: float = 1.,
                replay_client: Optional[reverb.Client] = None,
                counter: Optional[counting.Counter] = None,
-               logger: Optional[loggers.Logger] = None):
+               logger: Optional[loggers.Logger] = None,
+               num_sgd_steps_per_step: int = 1,
+               prefetch_buffer_size: int = 5):
     """Initializes the learner."""
     loss_fn = losses.PrioritizedDoubleQLearning(
         discount=discount,
@@ -63,4 +65,6 @@ class DQNLearner(learning_lib.SGDLearner):
         replay_client=replay_client,
         counter=counter,
         logger=logger,
+        num_sgd_steps_per_step=num_sgd_steps_per_step,
+        prefetch_buffer_size=prefetch_buffer_size,
     )
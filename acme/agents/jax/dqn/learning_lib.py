@@ -82,7 +82,8 @@ class SGDLearner(acme.Learner):
                replay_client: Optional[reverb.Client] = None,
                counter: Optional[counting.Counter] = None,
                logger: Optional[loggers.Logger] = None,
-               num_sgd_steps_per_step: int = 1):
+               num_sgd_steps_per_step: int = 1,
+               prefetch_buffer_size: int = 5):
     """Initialize the SGD learner."""
     self.network = network
 
@@ -122,7 +123,7 @@ class SGDLearner(acme.Learner):
     self._sgd_step = jax.jit(sgd_step)
 
     # Internalise agent components
-    self._data_iterator = utils.prefetch(data_iterator)
+    self._data_iterator = utils.prefetch(data_iterator, prefetch_buffer_size)
     self._target_update_period = target_update_period
     self._counter = counter or counting.Counter()
     self._logger = logger or loggers.TerminalLogger('learner', time_delta=1.)
@@ -0,0 +1,72 @@
+from typing import Optional, Sequence
+
+from acme import adders as adders_lib
+from acme import core
+from acme import types
+from acme.agents.jax import actors
+from acme.jax import networks as network_lib
+from acme.jax import utils
+
+import dm_env
+import jax
+
+
+class BatchedFeedForwardActor(core.Actor):
+  """A feed-forward actor which acts in several environments at once.
+
+  The policy is run on observations stacked along a leading [num_envs] axis, so
+  every environment gets its action from a single jitted call. Each environment
+  has its own adder since adders track one episode at a time; `observe_first`
+  and `observe` take the `index` of the environment they refer to.
+  """
+
+  def __init__(
+      self,
+      policy: actors.FeedForwardPolicy,
+      random_key: network_lib.PRNGKey,
+      variable_client,
+      adders: Optional[Sequence[adders_lib.Adder]] = None,
+      backend: Optional[str] = 'cpu',
+  ):
+    """Initializes a batched feed forward actor.
+
+    Args:
+      policy: A policy network taking a batch of observations and returning a
+        batch of actions.
+      random_key: Random key.
+      variable_client: The variable client to get policy parameters from.
+      adders: One adder per environment to add experiences to.
+      backend: Which backend to use for running the policy.
+    """
+    self._random_key = random_key
+
+    # Observations already carry the batch dimension, unlike FeedForwardActor.
+    def batched_policy(
+        params: network_lib.Params, key: network_lib.PRNGKey,
+        observations: network_lib.Observation
+    ) -> types.NestedArray:
+      key, key2 = jax.random.split(key)
+      return policy(params, key2, observations), key
+
+    self._policy = jax.jit(batched_policy, backend=backend)
+
+    self._adders = adders
+    self._client = variable_client
+
+  def select_action(self,
+                    observations: network_lib.Observation) -> types.NestedArray:
+    actions, self._random_key = self._policy(self._client.params,
+                                             self._random_key, observations)
+    return utils.to_numpy(actions)
+
+  def observe_first(self, timestep: dm_env.TimeStep, index: int = 0):
+    if self._adders:
+      self._adders[index].add_first(timestep)
+
+  def observe(self, action: network_lib.Action, next_timestep: dm_env.TimeStep,
+              index: int = 0):
+    if self._adders:
+      self._adders[index].add(action, next_timestep)
+
+  def update(self, wait: bool = False):
+    self._client.update(wait)
@@ -0,0 +1,105 @@
+"""Tests for the batched feed forward actor."""
+
+from absl.testing import absltest
+
+import custom_actors
+import dm_env
+import jax
+import jax.numpy as jnp
+import numpy as np
+import rlax
+
+NUM_ENVS = 3
+NUM_ACTIONS = 4
+
+
+class FakeVariableClient:
+  """Serves fixed params and counts updates."""
+
+  def __init__(self, params):
+    self.params = params
+    self.num_updates = 0
+
+  def update(self, wait=False):
+    self.num_updates += 1
+
+
+class RecordingAdder:
+  """Records the calls made to it."""
+
+  def __init__(self):
+    self.calls = []
+
+  def add_first(self, timestep):
+    self.calls.append('add_first')
+
+  def add(self, action, next_timestep):
+    self.calls.append(('add', int(action)))
+
+  def reset(self):
+    pass
+
+
+def _make_policy(epsilon):
+  """Epsilon-greedy over action values `observations @ params`."""
+  sampler = rlax.epsilon_greedy(epsilon)
+
+  def policy(params, key, observations):
+    return sampler.sample(key, jnp.dot(observations, params))
+
+  return policy
+
+
+def _make_actor(epsilon, num_envs=NUM_ENVS, adders=None, variable_client=None):
+  # picks action `index % NUM_ACTIONS` for a one-hot observation of `index`
+  params = np.eye(num_envs, NUM_ACTIONS, dtype=np.float32)
+  for index in range(num_envs):
+    params[index, index % NUM_ACTIONS] = 1.
+  return custom_actors.BatchedFeedForwardActor(
+      policy=_make_policy(epsilon),
+      random_key=jax.random.PRNGKey(0),
+      variable_client=variable_client or FakeVariableClient(params),
+      adders=adders)
+
+
+class BatchedFeedForwardActorTest(absltest.TestCase):
+
+  def test_greedy_actions_per_row(self):
+    actor = _make_actor(epsilon=0.)
+    actions = actor.select_action(np.eye(NUM_ENVS, dtype=np.float32))
+
+    self.assertIsInstance(actions, np.ndarray)
+    np.testing.assert_array_equal(actions, np.arange(NUM_ENVS) % NUM_ACTIONS)
+
+  def test_exploration_is_sampled_per_row(self):
+    num_envs = 64
+    actor = _make_actor(epsilon=1., num_envs=num_envs)
+    actions = actor.select_action(np.eye(num_envs, dtype=np.float32))
+
+    self.assertEqual(actions.shape, (num_envs,))
+    # a single draw shared by all rows would give identical actions
+    self.assertGreater(len(np.unique(actions)), 1)
+
+  def test_observe_routes_to_adder_by_index(self):
+    adders = [RecordingAdder() for _ in range(NUM_ENVS)]
+    actor = _make_actor(epsilon=0., adders=adders)
+    observation = np.zeros(NUM_ENVS, dtype=np.float32)
+
+    actor.observe_first(dm_env.restart(observation), index=2)
+    actor.observe(1, dm_env.transition(0., observation), index=2)
+    actor.observe_first(dm_env.restart(observation), index=0)
+
+    self.assertEqual(adders[0].calls, ['add_first'])
+    self.assertEqual(adders[1].calls, [])
+    self.assertEqual(adders[2].calls, ['add_first', ('add', 1)])
+
+  def test_update_forwards_to_variable_client(self):
+    client = FakeVariableClient(params=None)
+    actor = _make_actor(epsilon=0., variable_client=client)
+    actor.update()
+    actor.update(wait=True)
+    self.assertEqual(client.num_updates, 2)
+
+
+if __name__ == '__main__':
+  absltest.main()
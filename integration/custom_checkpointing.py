@@ -0,0 +1,33 @@
+"""Saving and loading of learner params as flat numpy archives."""
+
+import zipfile
+
+from acme import types
+
+import numpy as np
+import tree
+
+
+def save_params(path: str, params: types.NestedArray):
+  """Writes the flattened leaves of `params` (host arrays) as one npz archive.
+
+  Only the leaves are stored; the tree structure is recovered on load from a
+  matching nest, so nothing has to be pickled.
+  """
+  with open(path, 'wb') as f:
+    np.savez(f, *tree.flatten(params))
+
+
+def load_params(path: str, like: types.NestedArray) -> types.NestedArray:
+  """Reads an archive written by `save_params` into the structure of `like`."""
+  if not zipfile.is_zipfile(path):
+    # checkpoints from before the npz format are pickles of the params list
+    raise ValueError(
+        f'{path} is not an npz checkpoint. Checkpoints written by older versions '
+        'are pickled params; unpickle one and write it back with `save_params` '
+        'to convert it.')
+
+  with np.load(path) as archive:
+    leaves = [archive[f'arr_{i}'] for i in range(len(archive.files))]
+
+  return tree.unflatten_as(like, leaves)
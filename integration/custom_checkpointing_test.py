@@ -0,0 +1,51 @@
+"""Tests for custom_checkpointing.py."""
+
+import os
+import pickle
+import tempfile
+
+from absl.testing import absltest
+
+import custom_checkpointing
+import numpy as np
+import tree
+
+
+def _params():
+  return [{
+      'linear': {'w': np.arange(6, dtype=np.float32).reshape(2, 3),
+                 'b': np.ones(3, dtype=np.float32)},
+      'head': {'w': np.full((3, 4), 2., dtype=np.float32)},
+  }]
+
+
+class CheckpointingTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    directory = tempfile.TemporaryDirectory()
+    self.addCleanup(directory.cleanup)
+    self._directory = directory.name
+
+  def test_round_trip(self):
+    params = _params()
+    path = os.path.join(self._directory, 'checkpoint.npz')
+
+    custom_checkpointing.save_params(path, params)
+    like = tree.map_structure(np.zeros_like, params)
+    restored = custom_checkpointing.load_params(path, like)
+
+    tree.assert_same_structure(params, restored)
+    tree.map_structure(np.testing.assert_array_equal, params, restored)
+
+  def test_pickled_checkpoint_raises(self):
+    path = os.path.join(self._directory, 'checkpoint')
+    with open(path, 'wb') as f:
+      pickle.dump(_params(), f)
+
+    with self.assertRaisesRegex(ValueError, 'not an npz checkpoint'):
+      custom_checkpointing.load_params(path, _params())
+
+
+if __name__ == '__main__':
+  absltest.main()
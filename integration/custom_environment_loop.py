@@ -15,9 +15,10 @@
 
 """A simple agent-environment training loop."""
 
+import collections
 import operator
 import time
-from typing import Optional
+from typing import Optional, Sequence
 
 from acme import core
 from acme.utils import counting
@@ -164,5 +165,99 @@ class CustomEnvironmentLoop(core.Worker):
       self._logger.write(result)
 
 
+class BatchedEnvironmentLoop:
+  """Steps several environments in lockstep with one batched actor.
+
+  Observations from every environment are stacked so the actor picks all
+  actions in a single call; see `custom_actors.BatchedFeedForwardActor`.
+  Environments finishing an episode are reset independently while the others
+  keep going. `run_episode` returns completed episodes one at a time, so this
+  can stand in for `CustomEnvironmentLoop`.
+  """
+
+  def __init__(
+      self,
+      environments: Sequence[dm_env.Environment],
+      actor: core.Actor,
+      counter: Optional[counting.Counter] = None,
+      logger: Optional[loggers.Logger] = None,
+      should_update: bool = True,
+      label: str = 'environment_loop',
+  ):
+    # Internalize agent and environments.
+    self._environments = environments
+    self._actor = actor
+    self._counter = counter or counting.Counter()
+    self._logger = logger or loggers.make_default_logger(label)
+    self._should_update = should_update
+
+    # Per-environment episode state, populated lazily on the first step.
+    self._timesteps = None
+    self._episode_returns = [None] * len(environments)
+    self._episode_steps = [0] * len(environments)
+    self._start_times = [0.] * len(environments)
+    self._completed = collections.deque()
+
+  def _reset(self, index: int):
+    environment = self._environments[index]
+    self._start_times[index] = time.time()
+    self._episode_steps[index] = 0
+    self._episode_returns[index] = tree.map_structure(
+        _generate_zeros_from_spec, environment.reward_spec())
+    self._timesteps[index] = environment.reset()
+    self._actor.observe_first(self._timesteps[index], index=index)
+
+  def _step(self):
+    """Steps every environment once, resetting those whose episode ended."""
+    observations = tree.map_structure(
+        lambda *x: np.stack(x), *[t.observation for t in self._timesteps])
+    actions = self._actor.select_action(observations)
+
+    for index, environment in enumerate(self._environments):
+      action = tree.map_structure(lambda a, i=index: a[i], actions)
+      timestep = environment.step(action)
+      self._timesteps[index] = timestep
+      self._actor.observe(action, next_timestep=timestep, index=index)
+
+      # Book-keeping.
+      self._episode_steps[index] += 1
+      self._episode_returns[index] = tree.map_structure(
+          operator.iadd, self._episode_returns[index], timestep.reward)
+
+      if timestep.last():
+        self._completed.append(self._finish_episode(index))
+        self._reset(index)
+
+    if self._should_update:
+      self._actor.update()
+
+  def _finish_episode(self, index: int) -> loggers.LoggingData:
+    episode_steps = self._episode_steps[index]
+    counts = self._counter.increment(episodes=1, steps=episode_steps)
+    steps_per_second = episode_steps / (time.time() - self._start_times[index])
+    result = {
+        'episode_length': episode_steps,
+        'episode_return': self._episode_returns[index],
+        'steps_per_second': steps_per_second,
+    }
+    result.update(counts)
+    return result
+
+  def run_episode(self) -> loggers.LoggingData:
+    """Steps all environments until an episode completes, and returns it.
+
+    Returns:
+      An instance of `loggers.LoggingData` for the next completed episode.
+    """
+    if self._timesteps is None:
+      self._timesteps = [None] * len(self._environments)
+      for index in range(len(self._environments)):
+        self._reset(index)
+
+    while not self._completed:
+      self._step()
+    return self._completed.popleft()
+
+
 def _generate_zeros_from_spec(spec: specs.Array) -> np.ndarray:
   return np.zeros(spec.shape, spec.dtype)
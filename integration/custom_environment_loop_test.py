@@ -0,0 +1,79 @@
+"""Tests for the batched environment loop."""
+
+from absl.testing import absltest
+
+from acme import core
+from acme.testing import fakes
+from acme.utils import loggers
+import custom_environment_loop
+import numpy as np
+
+EPISODE_LENGTHS = (2, 3, 5)
+REWARDS = (1., 2., 3.)
+
+
+class RewardingEnvironment(fakes.DiscreteEnvironment):
+  """A fake environment paying a constant `reward` every step."""
+
+  def __init__(self, reward: float, **kwargs):
+    super().__init__(**kwargs)
+    self._reward = reward
+
+  def _generate_fake_reward(self):
+    return np.float32(self._reward)
+
+
+class BatchedRecordingActor(core.Actor):
+  """A batched actor recording which environments it observed."""
+
+  def __init__(self, num_envs: int):
+    self.num_envs = num_envs
+    self.first_observations = [0] * num_envs
+    self.observations = [0] * num_envs
+    self.num_updates = 0
+
+  def select_action(self, observations):
+    assert observations.shape[0] == self.num_envs
+    return np.zeros(self.num_envs, dtype=np.int32)
+
+  def observe_first(self, timestep, index=0):
+    assert timestep.first()
+    self.first_observations[index] += 1
+
+  def observe(self, action, next_timestep, index=0):
+    self.observations[index] += 1
+
+  def update(self, wait=False):
+    self.num_updates += 1
+
+
+class BatchedEnvironmentLoopTest(absltest.TestCase):
+
+  def test_episodes_of_different_lengths(self):
+    environments = [
+        RewardingEnvironment(reward, episode_length=length)
+        for length, reward in zip(EPISODE_LENGTHS, REWARDS)
+    ]
+    actor = BatchedRecordingActor(len(environments))
+    loop = custom_environment_loop.BatchedEnvironmentLoop(
+        environments, actor, logger=loggers.NoOpLogger())
+
+    results = [loop.run_episode() for _ in range(6)]
+
+    # Episodes come back in the order they complete: env 0 finishes at steps
+    # 2, 4 and 6, env 1 at steps 3 and 6, and env 2 at step 5.
+    self.assertEqual([r['episode_length'] for r in results],
+                     [2, 3, 2, 5, 2, 3])
+    self.assertEqual([r['episode_return'] for r in results],
+                     [2., 6., 2., 15., 2., 6.])
+    self.assertEqual(results[-1]['episodes'], 6)
+    self.assertEqual(results[-1]['steps'], sum(r['episode_length'] for r in results))
+
+    # The last two episodes completed on the same step, so six steps were taken.
+    self.assertEqual(actor.num_updates, 6)
+    self.assertEqual(actor.observations, [6, 6, 6])
+    self.assertEqual(actor.first_observations, [4, 3, 2])
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -0,0 +1,64 @@
+"""How many learner steps are owed for the observations inserted into replay."""
+
+from typing import Callable
+
+
+def make_num_learner_steps_fn(
+    observations_per_step: float) -> Callable[[int, int], int]:
+  """Returns a function of two cumulative insert counts `start` <= `end`.
+
+  The function gives the number of learner steps owed for the observations
+  inserted after the first `start` up to the `end`-th, so summing it over
+  consecutive polls gives the same total however often replay is polled.
+
+  `observations_per_step` is fixed for the whole run, so the branch on it is
+  taken once here instead of on every iteration of the training loop.
+  """
+  if observations_per_step > 1:
+    # One step for every observation whose count is a multiple of the period.
+    period = int(observations_per_step)
+    return lambda start, end: end // period - start // period
+  else:
+    # Always 1/obs_per_step steps for every observation.
+    steps = int(1 / observations_per_step)
+    return lambda start, end: (end - start) * steps
+
+
+class LearnerStepBudget:
+  """Counts the learner steps owed by replay inserts and the steps taken.
+
+  Steps are taken `sgd_steps_per_step` at a time, one fused `step()` each, and
+  never past `total_steps`. The replay table's rate limiter is MinSize, so
+  actors never wait for the learner and the insert count can run arbitrarily
+  far ahead of it. At most `max_pending_dispatches` fused steps are kept owed;
+  anything beyond that is dropped instead of being caught up on later.
+  """
+
+  def __init__(self,
+               num_learner_steps: Callable[[int, int], int],
+               sgd_steps_per_step: int,
+               max_pending_dispatches: int,
+               total_steps: int):
+    self._num_learner_steps = num_learner_steps
+    self._sgd_steps_per_step = sgd_steps_per_step
+    self._max_pending_steps = max_pending_dispatches * sgd_steps_per_step
+    self._total_steps = total_steps
+    self.pending = 0
+    self.completed = 0
+
+  def add(self, start: int, end: int):
+    """Adds the steps owed for the observations inserted in [start, end)."""
+    self.pending = min(self.pending + self._num_learner_steps(start, end),
+                       self._max_pending_steps)
+
+  def done(self) -> bool:
+    return self.completed >= self._total_steps
+
+  def ready(self) -> bool:
+    """Whether a fused step is owed and the run is not complete."""
+    return self.pending >= self._sgd_steps_per_step and not self.done()
+
+  def take(self):
+    """Records one fused `step()`."""
+    self.pending -= self._sgd_steps_per_step
+    self.completed += self._sgd_steps_per_step
@@ -0,0 +1,91 @@
+"""Tests for custom_learner_schedule.py."""
+
+from absl.testing import absltest
+
+import custom_learner_schedule
+
+
+class NumLearnerStepsTest(absltest.TestCase):
+
+  def test_one_step_per_period(self):
+    num_steps = custom_learner_schedule.make_num_learner_steps_fn(4.)
+
+    self.assertEqual(num_steps(0, 3), 0)
+    self.assertEqual(num_steps(3, 4), 1)
+    self.assertEqual(num_steps(4, 4), 0)
+    self.assertEqual(num_steps(4, 7), 0)
+    self.assertEqual(num_steps(0, 8), 2)
+    self.assertEqual(num_steps(5, 13), 2)
+
+  def test_polling_frequency_does_not_change_total(self):
+    num_steps = custom_learner_schedule.make_num_learner_steps_fn(4.)
+    polls = [0, 1, 2, 7, 8, 8, 15, 16, 23]
+
+    total = sum(num_steps(start, end) for start, end in zip(polls, polls[1:]))
+    self.assertEqual(total, num_steps(polls[0], polls[-1]))
+    self.assertEqual(total, 5)
+
+  def test_several_steps_per_observation(self):
+    num_steps = custom_learner_schedule.make_num_learner_steps_fn(0.25)
+
+    self.assertEqual(num_steps(2, 2), 0)
+    self.assertEqual(num_steps(2, 3), 4)
+    self.assertEqual(num_steps(2, 5), 12)
+
+  def test_one_step_per_observation(self):
+    num_steps = custom_learner_schedule.make_num_learner_steps_fn(1.)
+    self.assertEqual(num_steps(10, 17), 7)
+
+
+class LearnerStepBudgetTest(absltest.TestCase):
+
+  def _budget(self, max_pending_dispatches=4, total_steps=10**6):
+    return custom_learner_schedule.LearnerStepBudget(
+        custom_learner_schedule.make_num_learner_steps_fn(1.),
+        sgd_steps_per_step=16,
+        max_pending_dispatches=max_pending_dispatches,
+        total_steps=total_steps)
+
+  def _take_all(self, budget):
+    # the inner loop of `LearnerRay.run`
+    dispatches = 0
+    while budget.ready():
+      budget.take()
+      dispatches += 1
+    return dispatches
+
+  def test_steps_are_taken_fused(self):
+    budget = self._budget()
+
+    budget.add(0, 40)
+    self.assertEqual(self._take_all(budget), 2)
+    self.assertEqual(budget.completed, 32)
+    self.assertEqual(budget.pending, 8)
+
+    budget.add(40, 48)
+    self.assertEqual(self._take_all(budget), 1)
+    self.assertEqual(budget.pending, 0)
+
+  def test_large_insert_jump_is_capped(self):
+    budget = self._budget(max_pending_dispatches=4)
+
+    budget.add(0, 10**6)
+    self.assertEqual(budget.pending, 64)
+    self.assertEqual(self._take_all(budget), 4)
+    self.assertEqual(budget.completed, 64)
+
+    # the dropped backlog is not caught up on later
+    budget.add(10**6, 10**6 + 16)
+    self.assertEqual(self._take_all(budget), 1)
+
+  def test_stops_at_total_steps(self):
+    budget = self._budget(max_pending_dispatches=100, total_steps=48)
+
+    budget.add(0, 10**6)
+    self.assertEqual(self._take_all(budget), 3)
+    self.assertEqual(budget.completed, 48)
+    self.assertTrue(budget.done())
+
+
+if __name__ == '__main__':
+  absltest.main()
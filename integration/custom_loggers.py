@@ -0,0 +1,50 @@
+"""Loggers for the episode results of Ray actors."""
+
+import collections
+import sys
+
+import ray
+
+
+class ActorLogger():
+  """Keeps the last `max_episodes` results and prints them in batches.
+
+  Lines are buffered and written out every `flush_every` printed results, either
+  to stdout or, if a `sink` (a `LogSink` actor) is given, shipped to it without
+  waiting for a reply, so the episode loop never blocks on I/O.
+  """
+  def __init__(self, interval=1, disable_printing=False, max_episodes=None, flush_every=1, sink=None):
+    self.data = collections.deque(maxlen=max_episodes)
+    self.counter = 0
+    self.interval = interval
+    self.disable_printing = disable_printing
+    self.flush_every = flush_every
+    self.sink = sink
+    self._lines = []
+    if self.disable_printing: print("actor logger printing temporarily disabled")
+
+  def write(self, s):
+    self.data.append(s)
+    if self.counter % self.interval == 0 and not self.disable_printing:
+      self._lines.append(f"{s}\n")
+      if len(self._lines) >= self.flush_every:
+        self.flush()
+    self.counter += 1
+
+  def flush(self):
+    if not self._lines:
+      return
+    if self.sink is not None:
+      self.sink.write.remote(self._lines)
+    else:
+      sys.stdout.writelines(self._lines)
+      sys.stdout.flush()
+    self._lines = []
+
+
+@ray.remote(num_cpus=0)
+class LogSink():
+  """Prints batches of log lines on behalf of actors."""
+  def write(self, lines):
+    sys.stdout.writelines(lines)
+    sys.stdout.flush()
@@ -0,0 +1,73 @@
+"""Tests for custom_loggers.py."""
+
+import io
+from unittest import mock
+
+from absl.testing import absltest
+
+import custom_loggers
+
+
+class RecordingSink:
+  """Stands in for a `LogSink` actor handle, recording the batches sent."""
+
+  def __init__(self):
+    self.batches = []
+    self.write = self
+
+  def remote(self, lines):
+    self.batches.append(list(lines))
+
+
+class ActorLoggerTest(absltest.TestCase):
+
+  def test_keeps_last_max_episodes(self):
+    logger = custom_loggers.ActorLogger(max_episodes=3, sink=RecordingSink())
+    for i in range(5):
+      logger.write({'episode': i})
+
+    self.assertEqual([d['episode'] for d in logger.data], [2, 3, 4])
+
+  def test_prints_every_interval_results(self):
+    sink = RecordingSink()
+    logger = custom_loggers.ActorLogger(interval=3, sink=sink)
+    for i in range(7):
+      logger.write(i)
+
+    self.assertEqual(sink.batches, [['0\n'], ['3\n'], ['6\n']])
+    self.assertLen(logger.data, 7)
+
+  def test_holds_lines_until_flush_every(self):
+    sink = RecordingSink()
+    logger = custom_loggers.ActorLogger(flush_every=3, sink=sink)
+    for i in range(4):
+      logger.write(i)
+    self.assertEqual(sink.batches, [['0\n', '1\n', '2\n']])
+
+    logger.flush()
+    self.assertEqual(sink.batches, [['0\n', '1\n', '2\n'], ['3\n']])
+
+    # nothing is left to send
+    logger.flush()
+    self.assertLen(sink.batches, 2)
+
+  def test_flushes_to_stdout_without_sink(self):
+    logger = custom_loggers.ActorLogger(flush_every=2)
+    with mock.patch('sys.stdout', new_callable=io.StringIO) as stdout:
+      logger.write('a')
+      self.assertEqual(stdout.getvalue(), '')
+      logger.write('b')
+      self.assertEqual(stdout.getvalue(), 'a\nb\n')
+
+  def test_disable_printing_only_records(self):
+    sink = RecordingSink()
+    logger = custom_loggers.ActorLogger(disable_printing=True, sink=sink)
+    logger.write(0)
+    logger.flush()
+
+    self.assertEqual(sink.batches, [])
+    self.assertLen(logger.data, 1)
+
+
+if __name__ == '__main__':
+  absltest.main()
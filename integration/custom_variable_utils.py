@@ -1,10 +1,10 @@
-from concurrent import futures
 from typing import List, Optional, Sequence, Union
 
 from acme import core
 from acme.jax import networks as network_types
 
 import jax
+import jax.numpy as jnp
 import ray
 import datetime
 
@@ -17,6 +17,7 @@ class RayVariableClient:
                key: Union[str, Sequence[str]],
                update_period: int = 1,
                device: Optional[str] = None,
+               dtype: Optional[jnp.dtype] = None,
                temp_client_key: str = None):
     """Initializes the variable client.
 
@@ -27,6 +28,8 @@ class RayVariableClient:
       update_period: Interval between fetches.
       device: The name of a JAX device to put variables on. If None (default),
         don't put to device.
+      dtype: A dtype to cast variables to once they arrive. If None (default),
+        keep the dtype they were sent in.
     """
     self._temp_client_key = temp_client_key # temporary uuid that enables logging the variable update timing
 
@@ -39,25 +42,35 @@ class RayVariableClient:
     self._device = None
     if device:
       self._device = jax.devices(device)[0]
+    self._dtype = dtype
 
-    self._executor = futures.ThreadPoolExecutor(max_workers=1)
     if isinstance(key, str):
       key = [key]
     self._request = lambda k=key: ray.get(client.get_variables.remote(k))
-    self._future: Optional[futures.Future] = None
-    self._async_request = lambda: self._executor.submit(self._request)
+    # Asynchronous requests are plain ObjectRefs, polled with `ray.wait` rather
+    # than blocked on from a helper thread.
+    self._pending: Optional[ray.ObjectRef] = None
+    self._pending_start_time = None
+    self._async_request = lambda k=key: client.get_variables.remote(k)
+    # The last reference to variables the source handed back, if it hands any.
+    self._last_ref: Optional[ray.ObjectRef] = None
 
   def update(self, wait: bool = False) -> None:
     """Periodically updates the variables with the latest copy from the source.
 
     If wait is True, a blocking request is executed. Any active request will be
-    cancelled.
-    If wait is False, this method makes an asynchronous request for variables.
+    dropped.
+    If wait is False, this method makes an asynchronous request for variables,
+    and later calls swap them in once they have arrived without ever blocking.
 
     Args:
       wait: Whether to execute asynchronous (False) or blocking updates (True).
         Defaults to False.
     """
+    # Swap in the result of an earlier request if it has come back.
+    if self._pending is not None:
+      self._poll()
+
     # Track calls (we only update periodically).
     if self._call_counter < self._update_period:
       self._call_counter += 1
@@ -67,22 +80,35 @@ class RayVariableClient:
       return
 
     if wait:
-      if self._future is not None:
-        if self._future.running():
-          self._future.cancel()
-        self._future = None
+      self._pending = None
       self._call_counter = 0
       self.update_and_wait()
       return
 
     # Return early if we are still waiting for a previous request to come back.
-    if self._future and not self._future.done():
+    if self._pending is not None:
       return
 
-    # Get a future and add the copy function as a callback.
     self._call_counter = 0
-    self._future = self._async_request()
-    self._future.add_done_callback(lambda f: self._callback(f.result(), datetime.datetime.now()))
+    self._pending = self._async_request()
+    self._pending_start_time = datetime.datetime.now()
+
+  def _poll(self):
+    """Consumes the pending request if it is ready, without blocking."""
+    ready, _ = ray.wait([self._pending], timeout=0)
+    if not ready:
+      return
+
+    result = ray.get(self._pending)
+    if isinstance(result, ray.ObjectRef):
+      # The source handed back a reference to the variables; wait on that next,
+      # unless it is the one the current variables came from.
+      self._pending = None if result == self._last_ref else result
+      self._last_ref = result
+      return
+
+    self._pending = None
+    self._callback(result, self._pending_start_time)
 
   def update_and_wait(self):
     """Immediately update and block until we get the result."""
@@ -96,6 +122,9 @@ class RayVariableClient:
     else:
       self._params = params_list
 
+    if self._dtype is not None:
+      self._params = jax.tree_map(lambda x: x.astype(self._dtype), self._params)
+
     duration = datetime.datetime.now() - start_time
     duration = duration.total_seconds()
     
@@ -115,4 +144,71 @@ class RayVariableClient:
     if len(self._params) == 1:
       return self._params[0]
     else:
-      return self._params
\ No newline at end of file
+      return self._params
+
+class RayBroadcastVariableClient(RayVariableClient):
+  """A variable client which reads variables broadcast through Ray's object store.
+
+  Rather than every actor asking the learner to serialize its params, the
+  learner `ray.put`s them once per update and publishes the resulting ObjectRef
+  to a `SharedStorage` actor. Actors resolve that ref, so co-located actors read
+  the same shared-memory copy. A ref the current params already came from is
+  not resolved again.
+  """
+
+  def __init__(self,
+               storage,
+               ref_key: str = "params_ref",
+               update_period: int = 1,
+               device: Optional[str] = None,
+               dtype: Optional[jnp.dtype] = None,
+               temp_client_key: str = None):
+    """Initializes the variable client.
+
+    Args:
+      storage: The `SharedStorage` actor holding the latest params ObjectRef.
+      ref_key: The key the learner publishes the params ObjectRef under.
+      update_period: Interval between fetches.
+      device: The name of a JAX device to put variables on. If None (default),
+        don't put to device.
+      dtype: A dtype to cast variables to once they arrive. If None (default),
+        keep the dtype they were sent in.
+    """
+    super().__init__(
+        client=storage,
+        key=ref_key,
+        update_period=update_period,
+        device=device,
+        dtype=dtype,
+        temp_client_key=temp_client_key)
+    self._async_request = lambda: storage.get_info.remote(ref_key)
+
+    def request():
+      self._last_ref = ray.get(self._async_request())
+      return ray.get(self._last_ref)
+    self._request = request
+
+
+class RayPushedVariableClient(RayBroadcastVariableClient):
+  """A variable client whose updates are pushed to it instead of fetched.
+
+  The initial params are read from `SharedStorage` like the broadcast client,
+  after which the driver pushes every update through a compiled Ray graph.
+  `push` runs on a different thread of the (threaded) Ray actor than the one
+  acting, so it only stashes the params; `update` swaps them in on the acting
+  thread.
+  """
+
+  def __init__(self, *args, **kwargs):
+    super().__init__(*args, **kwargs)
+    self._pushed: Optional[List[network_types.Params]] = None
+
+  def push(self, params_list: List[network_types.Params]) -> None:
+    """Hands over the latest params; only the newest unswapped push is kept."""
+    self._pushed = params_list
+
+  def update(self, wait: bool = False) -> None:
+    """Swaps in the most recently pushed params, if any. Never blocks."""
+    params_list, self._pushed = self._pushed, None
+    if params_list is not None:
+      self._callback(params_list, datetime.datetime.now())
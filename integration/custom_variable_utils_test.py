@@ -0,0 +1,165 @@
+"""Tests for the Ray variable clients, against a local Ray instance."""
+
+import threading
+import time
+
+from absl.testing import absltest
+
+import custom_variable_utils
+import numpy as np
+import ray
+
+PARAMS = {'w': np.arange(4, dtype=np.float32)}
+
+
+@ray.remote(max_concurrency=2)
+class FakeVariableSource:
+  """Serves PARAMS; the first request blocks until `release` is called."""
+
+  def __init__(self):
+    self._released = threading.Event()
+    self._num_requests = 0
+
+  def get_variables(self, names):
+    self._num_requests += 1
+    if self._num_requests == 1:
+      self._released.wait()
+    return [PARAMS]
+
+  def release(self):
+    self._released.set()
+
+
+@ray.remote
+class FakeStorage:
+  """Holds the params ObjectRef, like `SharedStorage`."""
+
+  def __init__(self, refs):
+    # refs passed at the top level would be resolved, hence the list
+    self._ref, = refs
+
+  def get_info(self, key):
+    return self._ref
+
+
+def _update_until(client, condition, timeout=10.):
+  deadline = time.time() + timeout
+  while not condition():
+    if time.time() > deadline:
+      raise TimeoutError('variable client did not update in time')
+    client.update()
+    time.sleep(0.01)
+
+
+def _assert_params(client):
+  np.testing.assert_array_equal(client.params['w'], PARAMS['w'])
+
+
+class RayVariableClientTest(absltest.TestCase):
+
+  @classmethod
+  def setUpClass(cls):
+    super().setUpClass()
+    ray.init(num_cpus=2, include_dashboard=False)
+
+  @classmethod
+  def tearDownClass(cls):
+    ray.shutdown()
+    super().tearDownClass()
+
+  def test_update_does_not_block_on_pending_request(self):
+    source = FakeVariableSource.remote()
+    client = custom_variable_utils.RayVariableClient(source, key='policy')
+
+    client.update()
+    client.update()
+    self.assertIsNotNone(client._pending)
+    self.assertEqual(client._num_updates, 0)
+
+    ray.get(source.release.remote())
+    _update_until(client, lambda: client._num_updates == 1)
+    _assert_params(client)
+
+  def test_update_period(self):
+    source = FakeVariableSource.remote()
+    ray.get(source.release.remote())
+    client = custom_variable_utils.RayVariableClient(
+        source, key='policy', update_period=3)
+
+    client.update()
+    client.update()
+    self.assertIsNone(client._pending)
+    client.update()
+    self.assertIsNotNone(client._pending)
+
+  def test_wait_drops_pending_request(self):
+    source = FakeVariableSource.remote()
+    client = custom_variable_utils.RayVariableClient(source, key='policy')
+
+    # the first request stays blocked on the source
+    client.update()
+    self.assertIsNotNone(client._pending)
+
+    client.update(wait=True)
+    self.assertIsNone(client._pending)
+    self.assertEqual(client._num_updates, 1)
+    _assert_params(client)
+    ray.get(source.release.remote())
+
+  def test_broadcast_client_resolves_ref_then_value(self):
+    storage = FakeStorage.remote([ray.put([PARAMS])])
+    client = custom_variable_utils.RayBroadcastVariableClient(storage)
+
+    client.update()
+    storage_reply = client._pending
+    ray.wait([storage_reply])
+
+    # the storage reply is itself a ref, which is waited on next
+    client.update()
+    self.assertIsNotNone(client._pending)
+    self.assertIsNot(client._pending, storage_reply)
+    self.assertEqual(client._num_updates, 0)
+
+    ray.wait([client._pending])
+    client.update()
+    self.assertEqual(client._num_updates, 1)
+    _assert_params(client)
+
+  def test_broadcast_client_skips_unchanged_ref(self):
+    storage = FakeStorage.remote([ray.put([PARAMS])])
+    client = custom_variable_utils.RayBroadcastVariableClient(storage)
+    client.update_and_wait()
+    self.assertEqual(client._num_updates, 1)
+
+    # storage still holds the ref the current params came from
+    client.update()
+    ray.wait([client._pending])
+    client.update()
+
+    # so that request ends there, without fetching the params again, and the
+    # same update asks storage afresh
+    self.assertEqual(client._num_updates, 1)
+    self.assertIsInstance(ray.get(client._pending), ray.ObjectRef)
+
+  def test_pushed_client_swaps_in_latest_push_on_update(self):
+    storage = FakeStorage.remote([ray.put([PARAMS])])
+    client = custom_variable_utils.RayPushedVariableClient(storage)
+    client.update_and_wait()
+    self.assertEqual(client._num_updates, 1)
+
+    client.push([{'w': PARAMS['w'] + 1}])
+    client.push([{'w': PARAMS['w'] + 2}])
+    np.testing.assert_array_equal(client.params['w'], PARAMS['w'])
+
+    client.update()
+    self.assertEqual(client._num_updates, 2)
+    np.testing.assert_array_equal(client.params['w'], PARAMS['w'] + 2)
+
+    # nothing new was pushed, and storage is never polled again
+    client.update()
+    self.assertEqual(client._num_updates, 2)
+    self.assertIsNone(client._pending)
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -16,10 +16,11 @@ CustomConfig
 - holds all the config-related stuff (e.g. print intervals, learning rate)
 """
 import ray
+from ray.util.placement_group import placement_group, remove_placement_group
+from ray.util.scheduling_strategies import PlacementGroupSchedulingStrategy
 import jax
 import jax.numpy as jnp
 import rlax
-import optax
 import reverb
 import numpy as np
 import haiku as hk
@@ -29,14 +30,12 @@ import functools
 import gym
 from acme import wrappers
 import uuid
-import pickle
 import argparse
 import operator
 import tree
 
 import acme
 from acme import specs
-from acme import datasets
 from acme.jax import utils
 from acme.jax import networks as networks_lib
 from acme.agents import replay
@@ -48,15 +47,30 @@ from acme.utils import counting
 from acme.utils import loggers
 
 from acme.jax import variable_utils
-from custom_variable_utils import RayVariableClient
+from custom_variable_utils import RayBroadcastVariableClient, RayPushedVariableClient
 
 from acme.agents.jax.dqn import DQNConfig
-from acme.agents.jax.dqn.agent import DQNFromConfig
-from acme.agents.jax.dqn import learning
-import custom_learning_lib
 
-from custom_environment_loop import CustomEnvironmentLoop
+import custom_checkpointing
+import custom_learner_schedule
+from custom_environment_loop import BatchedEnvironmentLoop, CustomEnvironmentLoop
+from custom_actors import BatchedFeedForwardActor
 from custom_config import RainbowDQNConfig
+from custom_loggers import ActorLogger, LogSink
+
+
+# The Ray release the compiled graph broadcast was run with: earlier 2.x
+# releases had a different `experimental_compile`/`execute` API. Everything
+# else only needs Ray 2.x.
+COMPILED_GRAPH_MIN_RAY_VERSION = "2.40"
+
+# Ray workers are started with these so actors, which only ever act on CPU,
+# skip GPU/TPU discovery and don't grab an accelerator the learner needs.
+ACTOR_ENV_VARS = {
+  "TF_CPP_MIN_LOG_LEVEL": "3",
+  "CUDA_VISIBLE_DEVICES": "",
+  "JAX_PLATFORM_NAME": "cpu",
+}
 
 
 parser = argparse.ArgumentParser(description='Run integration tests of custom Acme features.')
@@ -68,13 +82,30 @@ parser.add_argument('--ram_states', help='Enables training on RAM states instead
 parser.add_argument("--force_cpu", help="Force all workers to use CPU.", action="store_true")
 parser.add_argument("--multicore_tpu", help="Enables custom learning_lib with cross-TPU-core training.", action="store_true")
 
+parser.add_argument('--learner_num_cpus', type=float, default=1, help='Number of CPUs to reserve for the learner.')
+parser.add_argument('--learner_num_gpus', type=float, default=0, help='Number of GPUs to reserve for the learner.')
+parser.add_argument('--actor_num_cpus', type=float, default=1, help='Number of CPUs to reserve per actor (env stepping plus the jax/reverb background threads).')
+parser.add_argument('--placement_group_timeout', type=float, default=60, help='Seconds to wait for the cluster to fit the learner and actors before giving up.')
+parser.add_argument('--actor_bfloat16', help="Broadcast bfloat16 copies of the learner's params to halve the bytes actors pull. Actors upcast them back to float32 on arrival, since bfloat16 matmuls are emulated (and slower) on CPU.", action="store_true")
+parser.add_argument('--envs_per_actor', type=int, default=1, help='Number of environments each actor steps with one batched policy call.')
 parser.add_argument('--num_actors', type=int, default=1,help='Number of actors to run.')
 
 parser.add_argument('--custom_variable_update', help="Enables custom variable_client with Ray compatibility.", action="store_true")
 
 parser.add_argument('--episode_return_goal', type=float, default=100.0 ,help='Target max return for model test.')
 parser.add_argument('--num_log_episodes', type=int, default=200 ,help='Number of episodes to store for plotting.')
+parser.add_argument('--log_flush_episodes', type=int, default=100, help='Number of logged episodes buffered before they are printed in one batch.')
 parser.add_argument('--total_learning_steps', type=float, default=2e8 ,help='Number of training steps to run.')
+parser.add_argument('--terminate_poll_interval', type=int, default=16, help='Number of episodes between actor checks of the terminate signal.')
+parser.add_argument('--variable_update_period', type=int, default=100, help='Number of learner steps between variable broadcasts to actors.')
+parser.add_argument('--compiled_param_broadcast', help=f"Push learner params to actors through a compiled Ray graph driven by the driver. Needs Ray >= {COMPILED_GRAPH_MIN_RAY_VERSION}.", action="store_true")
+parser.add_argument('--compiled_broadcast_interval', type=float, default=1.0, help='Seconds between compiled graph param broadcasts. `compiled_param_broadcast` must be True.')
+parser.add_argument('--adder_max_in_flight_items', type=int, default=16, help='Number of unconfirmed items an actor may have in flight to Reverb.')
+parser.add_argument('--num_sgd_steps_per_step', type=int, default=16, help='Number of SGD steps fused into a single jitted learner step.')
+
+parser.add_argument("--max_pending_learner_dispatches", type=int, default=4, help="Fused learner steps that may be owed at once; steps owed beyond this when actors outpace the learner are dropped.")
+parser.add_argument("--replay_info_ttl", type=float, default=0.1, help="Seconds between learner polls of the replay table's insert count.")
+parser.add_argument("--compilation_cache_dir", type=str, default="/dev/shm/jax_cc", help="Directory for the learner's persistent JAX compilation cache.")
 
 parser.add_argument("--enable_checkpointing", help="Learner will checkpoint at preconfigured intervals.", action="store_true")
 parser.add_argument("--initial_checkpoint", help="Learner will load from initial checkpoint before training.", action="store_true")
@@ -114,6 +145,33 @@ def environment_factory(evaluation: bool = False, level: str = 'BreakoutNoFrames
     ])
 
 
+def initialize_compilation_cache(cache_dir):
+  """Points JAX's persistent compilation cache at `cache_dir`, if it can be used.
+
+  The cache only stores GPU/TPU executables, so this is a no-op on CPU (actors
+  always act on CPU and don't call it). Newer jax configures the cache through
+  the `jax_compilation_cache_dir` option, older releases through
+  `compilation_cache.initialize_cache`, and the pinned 0.2.14 has neither.
+  Returns whether the cache was enabled.
+  """
+  if jax.default_backend() not in ("gpu", "tpu"):
+    return False
+
+  try:
+    jax.config.update("jax_compilation_cache_dir", cache_dir)
+    return True
+  except AttributeError:
+    pass
+
+  try:
+    from jax.experimental.compilation_cache import compilation_cache
+    compilation_cache.initialize_cache(cache_dir)
+    return True
+  except (ImportError, AttributeError):
+    print("persistent compilation cache is not available in this version of jax")
+    return False
+
+
 def network_factory(ram_states, spec):
   """Creates network."""
   def network(x):
@@ -141,19 +199,49 @@ def network_factory(ram_states, spec):
   return network
 
 
-def make_actor(policy_network, random_key, adder = None, variable_source = None, temp_client_key=None):
-  """Creates an actor."""
-  assert variable_source is not None, "make_actor doesn't support None for `variable_source` right now"
+def make_policy(network, epsilon):
+  """Creates an epsilon-greedy policy over the network's action values.
+
+  Not jitted here: FeedForwardActor jits the whole policy, so the forward pass
+  and epsilon-greedy sampling are traced into the same XLA computation.
+  """
+  sampler = rlax.epsilon_greedy(epsilon)
+
+  def policy(params: networks_lib.Params, key: jnp.ndarray,
+             observation: jnp.ndarray) -> jnp.ndarray:
+    action_values = network.apply(params, observation)
+    return sampler.sample(key, action_values)
+
+  return policy
+
 
-  variable_client = RayVariableClient(
-      client=variable_source,
-      key='',
-      # variables={'policy': policy_network.variables},
+def make_variable_client(shared_storage, temp_client_key=None):
+  """Creates the client an actor reads the learner's broadcast variables through."""
+  # with a compiled broadcast graph, only the initial params come from storage
+  client_cls = RayPushedVariableClient if args.compiled_param_broadcast else RayBroadcastVariableClient
+  variable_client = client_cls(
+      storage=shared_storage,
       update_period=100,
+      # Inference happens on CPU, so put variables there once per update rather
+      # than transferring the host copy on every policy call.
+      device='cpu',
+      # bfloat16 is only for the transfer; XLA:CPU emulates bfloat16 matmuls
+      dtype=jnp.float32 if args.actor_bfloat16 else None,
       temp_client_key=temp_client_key
   )
 
   variable_client.update_and_wait()
+  return variable_client
+
+
+def make_actor(policy_network, random_key, variable_client, adder = None, batched_adders=None):
+  """Creates an actor. Passing one adder per env in `batched_adders` makes it act on a batch of envs."""
+  if batched_adders is not None:
+    return BatchedFeedForwardActor(
+      policy=policy_network,
+      random_key=random_key,
+      variable_client=variable_client,
+      adders=batched_adders)
 
   actor = actors.FeedForwardActor(
     policy=policy_network,
@@ -163,14 +251,24 @@ def make_actor(policy_network, random_key, adder = None, variable_source = None,
   return actor
 
 
-def make_adder(reverb_client):
+def make_adder(reverb_client, n_step, discount):
   """Creates a reverb adder."""
-  return adders.NStepTransitionAdder(reverb_client, config.n_step, config.discount)
+  # letting more items be in flight keeps the actor from blocking on every insert
+  # while the writer streams chunks to the server
+  return adders.NStepTransitionAdder(
+    reverb_client,
+    n_step,
+    discount,
+    max_in_flight_items=args.adder_max_in_flight_items)
 
 
 def make_learner(network, optimizer, data_iterator, reverb_client, random_key, logger=None, checkpoint=None, custom=False):
   # TODO: add a sexy logger here
-  source = custom_learning_lib if custom else learning
+  # learner-only modules are imported here so actor workers never load them
+  if custom:
+    import custom_learning_lib as source
+  else:
+    from acme.agents.jax.dqn import learning as source
 
   learner = source.DQNLearner(
     network=network,
@@ -181,12 +279,20 @@ def make_learner(network, optimizer, data_iterator, reverb_client, random_key, l
     target_update_period=config.target_update_period,
     iterator=data_iterator,
     replay_client=reverb_client,
-    logger=logger
+    logger=logger,
+    num_sgd_steps_per_step=config.num_sgd_steps_per_step,
+    # Each element holds batch_size * num_sgd_steps_per_step transitions (~0.9GB
+    # of pixel observations at the defaults). A buffer of 2 keeps at most one
+    # queued element plus the one being copied on the device next to the batch
+    # in use, so about 3 elements (~2.7GB) of device memory.
+    prefetch_buffer_size=2
   )
   return learner
 
 
 def make_optimizer():
+  import optax
+
   optimizer = optax.chain(
     optax.clip_by_global_norm(config.max_gradient_norm),
     optax.adam(config.learning_rate),
@@ -194,24 +300,13 @@ def make_optimizer():
   return optimizer
 
 
-class ActorLogger():
-  def __init__(self, interval=1, disable_printing=False):
-    self.data = []
-    self.counter = 0
-    self.interval = interval
-    self.disable_printing = disable_printing
-    if self.disable_printing: print("actor logger printing temporarily disabled")
-
-  def write(self, s):
-    self.data.append(s)
-    if self.counter % self.interval == 0:
-      if not self.disable_printing: print(s)
-      self.counter += 1
-
-@ray.remote
+@ray.remote(num_cpus=0, max_concurrency=16)
 class SharedStorage():
     """
     Class which run in a dedicated thread to store the network weights and some information.
+
+    Lookups are trivial dict accesses, so it doesn't reserve a CPU and serves
+    concurrent callers from a thread pool instead of queueing them.
     """
     def __init__(self):
       self.current_checkpoint = {}
@@ -234,54 +329,78 @@ class SharedStorage():
         else:
             raise TypeError
 
-@ray.remote(num_cpus=1)
+@ray.remote # resources are set by the driver, see `--actor_num_cpus`
 class ActorRay():
   """Glorified wrapper for environment loop."""
   
-  def __init__(self, reverb_address, variable_source, shared_storage, id=None, verbose=False, ram_states=False, spec=None):
+  def __init__(self, reverb_address, shared_storage, epsilon, n_step, discount, id=None, verbose=False, ram_states=False, spec=None, random_key=None, log_sink=None):
+    # `epsilon`, `n_step` and `discount` come in as plain values rather than
+    # read off `config`: unpickling a DQNConfig imports the whole dqn package,
+    # learner included, in every actor process
     self._verbose = verbose
     self._id = str(id) or uuid.uuid1()
 
     self._shared_storage = shared_storage
+    self._terminate = False
+    self._terminate_ref = None
 
     self._client = reverb.Client(reverb_address)
 
     print("A - flag 0.5")
 
-    network = network_factory(ram_states, spec)
-    def policy(params: networks_lib.Params, key: jnp.ndarray,
-               observation: jnp.ndarray) -> jnp.ndarray:
-      action_values = network.apply(params, observation) # how will this work when they're on different devices?
-      return rlax.epsilon_greedy(config.epsilon).sample(key, action_values)
-
+    policy = make_policy(network_factory(ram_states, spec), epsilon)
 
     # print("A - flag 1")
-    # todo: make this proper splitting and everything
-    random_key=jax.random.PRNGKey(1701)
-
+    # the driver hands every actor its own split of the master key so their
+    # exploration isn't correlated; put it on the policy's device once up front
+    if random_key is None:
+      random_key = jax.random.PRNGKey(1701)
+    random_key = jax.device_put(random_key, jax.devices('cpu')[0])
+
+    num_envs = args.envs_per_actor
+    self._variable_client = make_variable_client(self._shared_storage, temp_client_key=self._id)
     self._actor = make_actor(
       policy, 
       random_key,
-      adder=make_adder(self._client),
-      variable_source=variable_source,
-      temp_client_key=self._id
+      self._variable_client,
+      adder=make_adder(self._client, n_step, discount) if num_envs == 1 else None,
+      batched_adders=[make_adder(self._client, n_step, discount) for _ in range(num_envs)] if num_envs > 1 else None
     )
 
     print("A - flag 2")
-    self._environment = environment_factory()
+    self._environments = [environment_factory() for _ in range(num_envs)]
+
+    # the actor already jits the key split, forward pass and epsilon-greedy
+    # sampling into one XLA call; trigger its compilation here rather than on the
+    # first step of the first episode.
+    dummy_obs = utils.zeros_like(self._environments[0].observation_spec())
+    self._actor.select_action(dummy_obs if num_envs == 1 else utils.tile_nested(dummy_obs, num_envs))
     self._counter = counting.Counter() # prefix='actor'
     self._logger = ActorLogger(
       # interval=10, # log every 10 steps
       # disable_printing=(type(id) == int and (id % 4 == 0)) # only get every 4th actor to print shit
+      max_episodes=args.num_log_episodes,
+      flush_every=args.log_flush_episodes,
+      sink=log_sink
     ) # TODO: use config for `interval` arg
 
-    self._env_loop = CustomEnvironmentLoop(
-      self._environment, 
-      self._actor, 
-      counter=self._counter,
-      logger=self._logger,
-      should_update=True
-      )
+    if num_envs == 1:
+      self._env_loop = CustomEnvironmentLoop(
+        self._environments[0], 
+        self._actor, 
+        counter=self._counter,
+        logger=self._logger,
+        should_update=True
+        )
+    else:
+      # one batched policy call per step for all of this actor's envs
+      self._env_loop = BatchedEnvironmentLoop(
+        self._environments,
+        self._actor,
+        counter=self._counter,
+        logger=self._logger,
+        should_update=True
+        )
 
     print("A - flag 3")
 
@@ -292,22 +411,48 @@ class ActorRay():
   def ready(self):
     return True
 
+  def set_params(self, params_list):
+    """Receives params pushed by the compiled broadcast graph; swapped in on the next update.
+
+    The graph calls this from its own execution loop while `run` keeps the
+    actor busy, so the actor must be started with `max_concurrency` >= 2.
+    """
+    self._variable_client.push(params_list)
+
+  def _poll_terminate(self):
+    """Refreshes the cached terminate flag from a previous request, if it has arrived."""
+    if self._terminate_ref is None:
+      self._terminate_ref = self._shared_storage.get_info.remote("terminate")
+
+    ready, _ = ray.wait([self._terminate_ref], timeout=0)
+    if ready:
+      self._terminate = ray.get(self._terminate_ref)
+      self._terminate_ref = None
+
   def run(self):
     if self._verbose: print(f"Actor {self._id}: beginning training.")
 
     steps=0
+    episodes=0
     result = self._env_loop.run_episode()
 
-    while result["episode_return"] < args.episode_return_goal and not ray.get(self._shared_storage.get_info.remote("terminate")):
+    while result["episode_return"] < args.episode_return_goal and not self._terminate:
           #result["counts"] < args.total_learning_steps and \
       result.update({
         "id": self._id
         })
       self._logger.write(result)
       steps += result['episode_length']
+      episodes += 1
+
+      # the terminate signal lives on another Ray actor, so only poll it every few
+      # episodes, and never block on the reply
+      if episodes % args.terminate_poll_interval == 0:
+        self._poll_terminate()
 
       result = self._env_loop.run_episode()
-      
+
+    self._logger.flush()
     #counts = result["counts"]
     print("******************************************")
     print("*****         TEST COMPLETE         *****")
@@ -319,27 +464,41 @@ class ActorRay():
 
 @ray.remote # max_concurrency=1 + N(cacher nodes)
 class LearnerRay():
-  def __init__(self, reverb_address, shared_storage, enable_checkpointing=False, verbose=False, ram_states=False, spec=None):
+  def __init__(self, reverb_address, shared_storage, enable_checkpointing=False, verbose=False, ram_states=False, spec=None, random_key=None):
     self._verbose = verbose
     self._enable_checkpointing = enable_checkpointing
     self._shared_storage = shared_storage
     self._client = reverb.Client(reverb_address)
 
+    initialize_compilation_cache(args.compilation_cache_dir)
+
     print("L - flag 0.5")
 
+    from acme import datasets
+
     data_iterator = datasets.make_reverb_dataset(
       table="priority_table",
       server_address=reverb_address,
-      batch_size=config.batch_size,
-      prefetch_size=4,
+      # each learner step consumes `num_sgd_steps_per_step` batches in one go, so
+      # `prefetch_size` elements already buffer that many times more batches
+      batch_size=config.batch_size * config.num_sgd_steps_per_step,
+      prefetch_size=config.prefetch_size,
     ).as_numpy_iterator()
 
+    # The learner pulls this generator from its own prefetch thread, so the
+    # host->device copy overlaps with the previous step without a second queue.
+    # `info` stays on the host since its keys are handed straight back to reverb
+    # for priority updates.
+    device = jax.devices()[0]
+    data_iterator = (
+      sample._replace(data=jax.device_put(sample.data, device)) for sample in data_iterator)
+
     print("L - flag 1")
-    # todo: sort out the key
 
     # disabled the logger because it's not toooo useful
     # self._logger = ActorLogger()
-    random_key = jax.random.PRNGKey(1701)
+    if random_key is None:
+      random_key = jax.random.PRNGKey(1701)
     self._learner = make_learner(
       network_factory(ram_states, spec), 
       make_optimizer(), 
@@ -349,25 +508,40 @@ class LearnerRay():
       # logger=self._logger
     )
 
+    # make sure actors have something to fetch before the first training step
+    ray.get(self.publish_variables())
+
     print("L - flag 2")
     print("devices:", jax.devices())
     if self._verbose: print(f"Learner: instantiated on {jnp.ones(3).device_buffer.device()}.")
 
-  @staticmethod
-  def _calculate_num_learner_steps(num_observations: int, min_observations: int, observations_per_step: float) -> int:
-    """Calculates the number of learner steps to do at step=num_observations."""
-    n = num_observations - min_observations
-    if observations_per_step > 1:
-      # One batch every 1/obs_per_step observations, otherwise zero.
-      return int(n % int(observations_per_step) == 0)
-    else:
-      # Always return 1/obs_per_step batches every observation.
-      return int(1 / observations_per_step)
+  def _num_inserts(self) -> int:
+    """Returns how many items have ever been inserted into the replay table."""
+    return self._client.server_info()["priority_table"].rate_limiter_info.insert_stats.completed
 
   def get_variables(self, names: Sequence[str]) -> List[types.NestedArray]:
     """This has to be called by a wrapper which uses the .remote postfix."""
     return self._learner.get_variables(names)
 
+  def _actor_variables(self):
+    """Returns the variables actors act with, as host arrays."""
+    variables = self._learner.get_variables("")
+    if args.actor_bfloat16:
+      # actors only need these for argmax, so halve the bytes they pull
+      variables = jax.tree_map(lambda x: x.astype(jnp.bfloat16), variables)
+    return jax.device_get(variables)
+
+  def publish_variables(self):
+    """Puts the current variables in the object store once and shares the ref with actors."""
+    ref = ray.put(self._actor_variables())
+    return self._shared_storage.set_info.remote({
+      "params_ref": ref
+    })
+
+  def broadcast_variables(self, _):
+    """Returns the variables actors act with. Source node of the compiled broadcast graph."""
+    return self._actor_variables()
+
   def save_checkpoint(self, path):
     weights_to_save = self._learner.get_variables("")
 
@@ -375,17 +549,17 @@ class LearnerRay():
     # path = "checkpoint"
 
     # todo: checkpoint_directory
-    with open(path, 'wb') as f:
-      pickle.dump(weights_to_save, f)
+    custom_checkpointing.save_params(path, jax.device_get(weights_to_save))
 
     if self._verbose: print("Learner: checkpoint saved successfully.")
     return True # todo: can we remove this?
 
   def load_checkpoint(self, path):
-    with open(path, 'rb') as f:
-      weights = pickle.load(f)
+    # the learner's current variables give the tree structure to restore into
+    weights = custom_checkpointing.load_params(path, self._learner.get_variables(""))
 
     self._learner.restore_from_single_weights(weights)
+    ray.get(self.publish_variables())
 
     if self._verbose: print("Learner: checkpoint restored successfully.")
 
@@ -394,33 +568,54 @@ class LearnerRay():
   def run(self, total_learning_steps: int = 2e8):
     if self._verbose: print("Learner: starting training.")
 
-    while self._client.server_info()["priority_table"].current_size < max(config.batch_size, config.min_replay_size):
+    sgd_steps_per_step = config.num_sgd_steps_per_step
+    min_observations = max(config.batch_size * sgd_steps_per_step, config.min_replay_size)
+
+    while self._client.server_info()["priority_table"].current_size < min_observations:
       time.sleep(0.1)
 
-    observations_per_step = config.batch_size / config.samples_per_insert
-    steps_completed = 0
+    budget = custom_learner_schedule.LearnerStepBudget(
+      custom_learner_schedule.make_num_learner_steps_fn(
+        observations_per_step=config.batch_size / config.samples_per_insert
+        ),
+      sgd_steps_per_step=sgd_steps_per_step,
+      max_pending_dispatches=args.max_pending_learner_dispatches,
+      total_steps=total_learning_steps
+      )
+    num_inserts = self._num_inserts()
+    last_poll_time = time.time()
 
     # TODO: migrate to the learner internal counter instance
-    while steps_completed < total_learning_steps:
-      steps = self._calculate_num_learner_steps(
-        num_observations=self._client.server_info()["priority_table"].current_size,
-        min_observations=max(config.batch_size, config.min_replay_size),
-        observations_per_step=observations_per_step
-        )
-
-      for _ in range(steps):
+    while not budget.done():
+      if not budget.ready():
+        # server_info() is a round-trip to the reverb server, so refresh the insert
+        # count at most every `replay_info_ttl` seconds. Steps are owed per insert,
+        # so nothing is missed by polling less often.
+        time.sleep(max(0., last_poll_time + args.replay_info_ttl - time.time()))
+        last_poll_time = time.time()
+        last_num_inserts, num_inserts = num_inserts, self._num_inserts()
+        budget.add(last_num_inserts, num_inserts)
+
+      # each call to `step()` runs `sgd_steps_per_step` SGD updates inside a single
+      # jitted `lax.scan`, so hold off dispatching until enough steps have accrued
+      while budget.ready():
         self._learner.step()
-        steps_completed += 1
+        budget.take()
+        steps_completed = budget.completed
+
+        # with a compiled broadcast graph the driver pulls params on its own schedule
+        if not args.compiled_param_broadcast and steps_completed % args.variable_update_period < sgd_steps_per_step:
+          self.publish_variables()
 
-        if self._enable_checkpointing and (steps_completed % config.checkpoint_interval == 0):
-          self.save_checkpoint(f"checkpoint-{steps_completed}.pickle")
+        if self._enable_checkpointing and (steps_completed % config.checkpoint_interval < sgd_steps_per_step):
+          self.save_checkpoint(f"checkpoint-{steps_completed}.npz")
 
         # todo: add evaluation
         # perhaps make a coordinator which runs learner for x steps, then calls an eval actor?
         # if steps_completed % config.eval_interval == 0:
         #   pass
 
-    if self._verbose: print(f"Learner complete at {steps_completed}. Terminating actors.")
+    if self._verbose: print(f"Learner complete at {budget.completed}. Terminating actors.")
     self._shared_storage.set_info.remote({
       "terminate": True
     })
@@ -430,8 +625,15 @@ if __name__ == '__main__':
 
   args = parser.parse_args()
 
+  if args.compiled_param_broadcast:
+    from packaging import version
+    if version.parse(ray.__version__) < version.parse(COMPILED_GRAPH_MIN_RAY_VERSION):
+      parser.error(f"--compiled_param_broadcast needs Ray >= {COMPILED_GRAPH_MIN_RAY_VERSION}, found {ray.__version__}")
+
   if args.force_cpu: jax.config.update('jax_platform_name', "cpu")
+  initialize_compilation_cache(args.compilation_cache_dir)
   config = RainbowDQNConfig() if args.rainbow_config else DQNConfig()
+  config.num_sgd_steps_per_step = args.num_sgd_steps_per_step
   spec = specs.make_environment_spec(environment_factory(args.ram_states))
 
   storage = SharedStorage.remote()
@@ -451,6 +653,7 @@ if __name__ == '__main__':
 
   if args.num_actors == 1:
     # bone stock Acme DQN
+    from acme.agents.jax.dqn.agent import DQNFromConfig
 
     network = network_factory(args.ram_states, spec)
     environment = environment_factory(args.ram_states)
@@ -464,6 +667,8 @@ if __name__ == '__main__':
     logger = ActorLogger(
       # interval=10, # log every 10 steps
       # disable_printing=(type(id) == int and (id % 4 == 0)) # only get every 4th actor to print shit
+      max_episodes=args.num_log_episodes,
+      flush_every=args.log_flush_episodes
     )
 
     loop = CustomEnvironmentLoop(
@@ -484,6 +689,7 @@ if __name__ == '__main__':
       steps += result['episode_length']
       result = loop.run_episode()
 
+    logger.flush()
     #counts = result["counts"]
     print("******************************************")
     print("*****         TEST COMPLETE         *****")
@@ -494,11 +700,46 @@ if __name__ == '__main__':
   else:
     # custom Ray Actor and Learner
 
-    learner = LearnerRay.options(max_concurrency=2).remote(
+    # reverb is served from this process and everyone connects via localhost, so
+    # the learner (bundle 0) and actors (bundles 1..N) must all land on this node.
+    # PACK alone may place them elsewhere, so each bundle also takes a sliver of
+    # this node's `node:<ip>` resource, which only this node has
+    driver_node = {f"node:{ray.util.get_node_ip_address()}": 0.001}
+    learner_bundle = {"CPU": args.learner_num_cpus, **driver_node}
+    if args.learner_num_gpus: learner_bundle["GPU"] = args.learner_num_gpus
+    bundles = [learner_bundle] + [{"CPU": args.actor_num_cpus, **driver_node}] * args.num_actors
+    pg = placement_group(bundles, strategy="PACK")
+
+    # an unsatisfiable group stays pending forever, so don't wait on it silently
+    ready, _ = ray.wait([pg.ready()], timeout=args.placement_group_timeout)
+    if not ready:
+      remove_placement_group(pg)
+      raise RuntimeError(
+        f"Could not reserve {args.learner_num_cpus + args.actor_num_cpus * args.num_actors} CPUs "
+        f"and {args.learner_num_gpus} GPUs for the learner and {args.num_actors} actors within "
+        f"{args.placement_group_timeout}s on the driver's node (cluster has {ray.cluster_resources()}). "
+        "Lower --actor_num_cpus/--learner_num_cpus or --num_actors.")
+
+    # actors ship their log lines here in batches instead of printing themselves
+    log_sink = LogSink.remote()
+
+    # one independent key for the learner and each actor
+    keys = np.asarray(jax.random.split(jax.random.PRNGKey(1701), args.num_actors + 1))
+
+    learner = LearnerRay.options(
+      # `run` holds one thread; the other serves `get_variables`/checkpoint calls
+      # before it starts, and the compiled broadcast graph's loop after
+      max_concurrency=2,
+      num_cpus=args.learner_num_cpus,
+      num_gpus=args.learner_num_gpus,
+      scheduling_strategy=PlacementGroupSchedulingStrategy(
+        placement_group=pg, placement_group_bundle_index=0)
+    ).remote(
       "localhost:8000",
       storage,
       enable_checkpointing=args.enable_checkpointing,
-      verbose=True
+      verbose=True,
+      random_key=keys[0]
     )
 
     # important to force the learner onto TPU
@@ -508,12 +749,23 @@ if __name__ == '__main__':
     if args.initial_checkpoint:
       ray.get(learner.load_checkpoint.remote(args.initial_checkpoint_path))
 
-    actors = [ActorRay.remote(
+    actors = [ActorRay.options(
+      # the compiled broadcast graph calls `set_params` while `run` is going
+      max_concurrency=2 if args.compiled_param_broadcast else 1,
+      runtime_env={"env_vars": ACTOR_ENV_VARS},
+      num_cpus=args.actor_num_cpus,
+      scheduling_strategy=PlacementGroupSchedulingStrategy(
+        placement_group=pg, placement_group_bundle_index=i + 1)
+    ).remote(
       "localhost:8000", 
-      learner, 
       storage,
+      config.epsilon,
+      config.n_step,
+      config.discount,
       verbose=True,
-      id=i
+      id=i,
+      random_key=keys[i + 1],
+      log_sink=log_sink
     ) for i in range(args.num_actors)] # 50
 
     [a.run.remote() for a in actors]
@@ -522,6 +774,22 @@ if __name__ == '__main__':
     # learner.run.remote(total_learning_steps=200)
     learner.run.remote(total_learning_steps=args.total_learning_steps)
 
+    if args.compiled_param_broadcast:
+      # The (learner, actors) topology is fixed, so compile the learner -> actors
+      # broadcast once and reuse its channels instead of a generic object store
+      # round-trip per update. Only the driver can execute the graph.
+      from ray.dag import InputNode, MultiOutputNode
 
-    while not ray.get(storage.get_info.remote("terminate")):
-      time.sleep(1)
+      with InputNode() as inp:
+        params = learner.broadcast_variables.bind(inp)
+        dag = MultiOutputNode([a.set_params.bind(params) for a in actors])
+      compiled_dag = dag.experimental_compile()
+
+      while not ray.get(storage.get_info.remote("terminate")):
+        ray.get(compiled_dag.execute(None))
+        time.sleep(args.compiled_broadcast_interval)
+
+      compiled_dag.teardown()
+    else:
+      while not ray.get(storage.get_info.remote("terminate")):
+        time.sleep(1)